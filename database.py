@@ -5,7 +5,10 @@ MongoDB helper functions ready to use in your backend code.
 Import and use these functions in your API endpoints for database operations.
 """
 
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, TEXT
+from pymongo.collation import Collation
+from pymongo.errors import OperationFailure
 from datetime import datetime, timezone
 import os
 from dotenv import load_dotenv
@@ -21,12 +24,25 @@ db = None
 database_url = os.getenv("DATABASE_URL")
 database_name = os.getenv("DATABASE_NAME")
 
+# Case-insensitive collation shared by the product title index and the
+# prefix (typeahead) queries that must use it
+TITLE_COLLATION = Collation(locale="en", strength=2)
+
 if database_url and database_name:
-    _client = MongoClient(database_url)
+    # One long-lived client per process, sized for concurrent async handlers
+    _client = AsyncIOMotorClient(
+        database_url,
+        maxPoolSize=int(os.getenv("MONGO_MAX_POOL_SIZE", "200")),
+        minPoolSize=int(os.getenv("MONGO_MIN_POOL_SIZE", "20")),
+        maxIdleTimeMS=60000,
+        serverSelectionTimeoutMS=3000,
+        retryWrites=True,
+        compressors="zstd,zlib",
+    )
     db = _client[database_name]
 
 # Helper functions for common database operations
-def create_document(collection_name: str, data: Union[BaseModel, dict]):
+async def create_document(collection_name: str, data: Union[BaseModel, dict]):
     """Insert a single document with timestamp"""
     if db is None:
         raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
@@ -40,10 +56,10 @@ def create_document(collection_name: str, data: Union[BaseModel, dict]):
     data_dict['created_at'] = datetime.now(timezone.utc)
     data_dict['updated_at'] = datetime.now(timezone.utc)
 
-    result = db[collection_name].insert_one(data_dict)
+    result = await db[collection_name].insert_one(data_dict)
     return str(result.inserted_id)
 
-def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None):
+async def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None):
     """Get documents from collection"""
     if db is None:
         raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
@@ -52,4 +68,38 @@ def get_documents(collection_name: str, filter_dict: dict = None, limit: int = N
     if limit:
         cursor = cursor.limit(limit)
     
-    return list(cursor)
+    return await cursor.to_list(length=limit)
+
+async def ping_database():
+    """Round-trip to the server so the pool is warm before the first request"""
+    if _client is None:
+        return
+    await _client.admin.command("ping")
+
+async def ensure_indexes():
+    """Create the indexes backing the API's hot queries (idempotent)"""
+    if db is None:
+        return
+
+    await db.product.create_index([("status", ASCENDING), ("category", ASCENDING)])
+    await db.product.create_index([("status", ASCENDING), ("seller_id", ASCENDING)])
+    text_keys = [("title", TEXT), ("tags", TEXT), ("description", TEXT)]
+    text_weights = {"title": 10, "tags": 5, "description": 1}
+    try:
+        await db.product.create_index(text_keys, weights=text_weights, name="product_text")
+    except OperationFailure as e:
+        # a collection only holds one text index; replace an outdated definition
+        # (IndexOptionsConflict / IndexKeySpecsConflict)
+        if e.code not in (85, 86):
+            raise
+        try:
+            await db.product.drop_index("product_text")
+        except OperationFailure as drop_error:
+            # another worker may have dropped it first (IndexNotFound)
+            if drop_error.code != 27:
+                raise
+        await db.product.create_index(text_keys, weights=text_weights, name="product_text")
+    await db.product.create_index([("title", ASCENDING)], collation=TITLE_COLLATION, name="product_title_ci")
+    await db.purchase.create_index([("buyer_email", ASCENDING), ("payment_status", ASCENDING), ("created_at", DESCENDING)])
+    await db.auditlog.create_index([("created_at", DESCENDING)])
+    await db.seller.create_index([("user_id", ASCENDING)])
@@ -1,20 +1,76 @@
 import os
+import asyncio
+import logging
+from collections import Counter
+from contextlib import asynccontextmanager, suppress
+from datetime import datetime, timezone
 from typing import List, Optional, Dict, Any
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
+import orjson
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import OperationFailure
+
+# Response cache (Redis when configured, in-process otherwise)
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from fastapi_cache.backends.redis import RedisBackend
+from fastapi_cache.decorator import cache
+from redis import asyncio as aioredis
 
 # Database helpers
-from database import db, create_document, get_documents
+from database import db, create_document, ensure_indexes, ping_database, TITLE_COLLATION
 
 # Stripe (optional for now)
 import stripe
 
 stripe.api_key = os.getenv("STRIPE_SECRET_KEY", "")
 STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET", "")
+REDIS_URL = os.getenv("REDIS_URL", "")
+VIEW_FLUSH_SECONDS = float(os.getenv("VIEW_FLUSH_SECONDS", "5"))
+AUDIT_BATCH_SIZE = 500
+AUDIT_FLUSH_SECONDS = 1.0
+
+logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Multi‑Vendor Digital Marketplace API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await ping_database()
+        await ensure_indexes()
+    except Exception as e:
+        # keep serving; /test reports the database state
+        logger.warning("Database warm-up failed: %s", e)
+    try:
+        await migrate_legacy_settings()
+    except Exception as e:
+        # get_settings/update_settings still seed from the legacy document
+        logger.warning("Legacy settings migration failed: %s", e)
+    if REDIS_URL:
+        FastAPICache.init(RedisBackend(aioredis.from_url(REDIS_URL)), prefix="mp")
+    else:
+        FastAPICache.init(InMemoryBackend(), prefix="mp")
+    view_flusher = asyncio.create_task(_view_flush_loop())
+    audit_writer = asyncio.create_task(_audit_writer())
+    yield
+    view_flusher.cancel()
+    with suppress(asyncio.CancelledError):
+        await view_flusher
+    await _flush_views()
+    # drain pending audit entries before the loop goes away
+    _audit_queue.put_nowait(None)
+    await audit_writer
+
+
+app = FastAPI(
+    title="Multi‑Vendor Digital Marketplace API",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -26,23 +82,72 @@ app.add_middleware(
 
 
 # ---------------------------- Utilities ------------------------------------
-class PyObjectId(ObjectId):
-    @classmethod
-    def __get_validators__(cls):
-        yield cls.validate
+def oid(id_str: str) -> ObjectId:
+    if not ObjectId.is_valid(id_str):
+        raise HTTPException(status_code=400, detail="Invalid id")
+    return ObjectId(id_str)
 
-    @classmethod
-    def validate(cls, v):
-        if not ObjectId.is_valid(v):
-            raise ValueError("Invalid objectid")
-        return ObjectId(v)
 
+# Trailing pipeline stages that expose _id as a string "id", so cursor
+# documents are response-ready without a Python post-processing pass.
+ID_AS_STRING = [
+    {"$addFields": {"id": {"$toString": "$_id"}}},
+    {"$project": {"_id": 0}},
+]
 
-def oid(id_str: str) -> ObjectId:
+
+async def _ndjson_lines(cursor):
+    async for doc in cursor:
+        yield orjson.dumps(doc, default=str) + b"\n"
+
+
+def ndjson_response(cursor) -> StreamingResponse:
+    """Stream a Motor cursor as newline-delimited JSON, one document per line"""
+    return StreamingResponse(_ndjson_lines(cursor), media_type="application/x-ndjson")
+
+
+# Audit entries are queued by the request handlers and written in batches by
+# a background task, so mutations don't pay a second insert round-trip.
+_audit_queue: asyncio.Queue = asyncio.Queue()
+
+
+def audit(entry: Dict[str, Any]):
+    now = datetime.now(timezone.utc)
+    _audit_queue.put_nowait({**entry, "created_at": now, "updated_at": now})
+
+
+async def _write_audit(batch: List[Dict[str, Any]]):
+    if db is None or not batch:
+        return
     try:
-        return ObjectId(id_str)
+        await db.auditlog.insert_many(batch, ordered=False)
     except Exception:
-        raise HTTPException(status_code=400, detail="Invalid id")
+        logger.exception("Failed to write %d audit log entries", len(batch))
+
+
+async def _audit_writer():
+    # Collect up to AUDIT_BATCH_SIZE entries or AUDIT_FLUSH_SECONDS worth,
+    # whichever comes first; a None entry flushes and stops the writer.
+    loop = asyncio.get_running_loop()
+    while True:
+        entry = await _audit_queue.get()
+        if entry is None:
+            return
+        batch = [entry]
+        stop = False
+        deadline = loop.time() + AUDIT_FLUSH_SECONDS
+        while len(batch) < AUDIT_BATCH_SIZE:
+            try:
+                entry = await asyncio.wait_for(_audit_queue.get(), deadline - loop.time())
+            except asyncio.TimeoutError:
+                break
+            if entry is None:
+                stop = True
+                break
+            batch.append(entry)
+        await _write_audit(batch)
+        if stop:
+            return
 
 
 # --------------------------- Schemas (DTOs) ---------------------------------
@@ -62,14 +167,48 @@ class ProductOut(BaseModel):
     id: str
     seller_id: str
     title: str
-    description: Optional[str]
+    description: Optional[str] = None
     price: float
-    currency: str
-    category: Optional[str]
+    currency: str = "usd"
+    category: Optional[str] = None
     tags: List[str] = []
-    preview_media_url: Optional[str]
-    status: str
-    stats: Dict[str, int]
+    preview_media_url: Optional[str] = None
+    status: str = "active"
+    stats: Dict[str, int] = {"views": 0, "sales": 0}
+
+
+# Fields read back for catalog responses; file_storage_key never leaves the DB
+# and the (potentially large) description is only sent on the detail view.
+PRODUCT_LIST_PROJECTION = {
+    "seller_id": 1, "title": 1, "price": 1, "currency": 1, "category": 1,
+    "tags": 1, "preview_media_url": 1, "status": 1, "stats": 1,
+}
+PRODUCT_DETAIL_PROJECTION = {**PRODUCT_LIST_PROJECTION, "description": 1}
+
+
+def _compile_product_converter(projection: Dict[str, Any]):
+    """Build a Mongo doc -> ProductOut-shaped dict function for a projection.
+
+    The body is generated once from ProductOut.model_fields so the per-document
+    work is a single dict literal: required fields are indexed directly and
+    optional ones fall back to the model default.
+    """
+    entries = ['"id": str(d["_id"])']
+    for name, field in ProductOut.model_fields.items():
+        if name == "id" or name not in projection:
+            continue
+        if field.is_required():
+            entries.append(f"{name!r}: d[{name!r}]")
+        else:
+            entries.append(f"{name!r}: d.get({name!r}, {field.default!r})")
+    src = "def convert(d):\n    return {" + ", ".join(entries) + "}\n"
+    namespace: Dict[str, Any] = {}
+    exec(src, namespace)
+    return namespace["convert"]
+
+
+_product_list_item = _compile_product_converter(PRODUCT_LIST_PROJECTION)
+_product_detail = _compile_product_converter(PRODUCT_DETAIL_PROJECTION)
 
 
 class CheckoutItem(BaseModel):
@@ -89,12 +228,12 @@ class UpdateStatus(BaseModel):
 
 # ---------------------------- Root & Health --------------------------------
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "Marketplace backend running"}
 
 
 @app.get("/test")
-def test_database():
+async def test_database():
     response = {
         "backend": "✅ Running",
         "database": "❌ Not Available",
@@ -107,7 +246,7 @@ def test_database():
     if db is not None:
         response["database"] = "✅ Available"
         try:
-            collections = db.list_collection_names()
+            collections = await db.list_collection_names()
             response["collections"] = collections[:10]
             response["connection_status"] = "Connected"
             response["database"] = "✅ Connected & Working"
@@ -119,127 +258,170 @@ def test_database():
 
 
 # ---------------------------- Public Catalog -------------------------------
-@app.get("/api/products", response_model=List[ProductOut])
-def list_products(q: Optional[str] = None, category: Optional[str] = None, seller_id: Optional[str] = None):
+PRODUCTS_CACHE_SECONDS = 30
+
+
+@app.get("/api/products")
+@cache(expire=PRODUCTS_CACHE_SECONDS, namespace="products")
+async def list_products(q: Optional[str] = None, prefix: Optional[str] = None, category: Optional[str] = None, seller_id: Optional[str] = None):
     flt: Dict[str, Any] = {"status": {"$ne": "suspended"}}
-    if q:
-        flt["title"] = {"$regex": q, "$options": "i"}
     if category:
         flt["category"] = category
     if seller_id:
         flt["seller_id"] = seller_id
-    docs = db.product.find(flt).limit(50)
-    out: List[ProductOut] = []
-    for d in docs:
-        out.append(ProductOut(
-            id=str(d.get("_id")),
-            seller_id=d.get("seller_id"),
-            title=d.get("title"),
-            description=d.get("description"),
-            price=d.get("price"),
-            currency=d.get("currency", "usd"),
-            category=d.get("category"),
-            tags=d.get("tags", []),
-            preview_media_url=d.get("preview_media_url"),
-            status=d.get("status", "active"),
-            stats=d.get("stats", {"views": 0, "sales": 0}),
-        ))
-    return out
+    if q:
+        # full-text search backed by the product_text index, best match first
+        flt["$text"] = {"$search": q}
+        projection = {**PRODUCT_LIST_PROJECTION, "score": {"$meta": "textScore"}}
+        docs = db.product.find(flt, projection).sort([("score", {"$meta": "textScore"})]).limit(50)
+    elif prefix:
+        # typeahead: case-insensitive range scan on the collated title index
+        # (U+FFFF sorts after every character under ICU collation)
+        flt["title"] = {"$gte": prefix, "$lt": prefix + "\uffff"}
+        docs = db.product.find(flt, PRODUCT_LIST_PROJECTION, collation=TITLE_COLLATION).sort("title", 1).limit(50)
+    else:
+        docs = db.product.find(flt, PRODUCT_LIST_PROJECTION).limit(50)
+    # Documents come from our own collection: return a ready-made response so
+    # FastAPI skips ProductOut validation and jsonable_encoder, and orjson
+    # encodes the dicts directly (the cache stores the rendered body as-is).
+    resp = ORJSONResponse(content=[_product_list_item(d) async for d in docs])
+    # fastapi-cache writes Cache-Control/ETag to the injected Response, which
+    # FastAPI discards when the handler returns its own response object; set
+    # the same values here so misses carry them as hits do.
+    resp.headers["Cache-Control"] = f"max-age={PRODUCTS_CACHE_SECONDS}"
+    resp.headers["ETag"] = f"W/{hash(resp.body)}"
+    return resp
+
+
+@cache(expire=PRODUCTS_CACHE_SECONDS, namespace="products")
+async def _load_product(product_id: str) -> Dict[str, Any]:
+    d = await db.product.find_one({"_id": oid(product_id)}, PRODUCT_DETAIL_PROJECTION)
+    if not d:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return _product_detail(d)
+
+
+# View counts are buffered per process and written in one bulk_write per
+# flush window, trading a few seconds of staleness for one write per read.
+_pending_views: Counter = Counter()
+
+
+async def _flush_views():
+    if db is None or not _pending_views:
+        return
+    snapshot = dict(_pending_views)
+    _pending_views.clear()
+    flushed = False
+    try:
+        await db.product.bulk_write(
+            [UpdateOne({"_id": pid}, {"$inc": {"stats.views": n}}) for pid, n in snapshot.items()],
+            ordered=False,
+        )
+        flushed = True
+    except Exception:
+        logger.exception("Failed to flush view counts for %d products", len(snapshot))
+    finally:
+        # keep the deltas for the next window, including when the flush is
+        # cancelled mid-write (CancelledError is not an Exception)
+        if not flushed:
+            _pending_views.update(snapshot)
+
+
+async def _view_flush_loop():
+    while True:
+        await asyncio.sleep(VIEW_FLUSH_SECONDS)
+        await _flush_views()
 
 
 @app.get("/api/products/{product_id}", response_model=ProductOut)
-def get_product(product_id: str):
-    d = db.product.find_one({"_id": oid(product_id)})
-    if not d:
-        raise HTTPException(status_code=404, detail="Product not found")
-    # increment view count
-    db.product.update_one({"_id": d["_id"]}, {"$inc": {"stats.views": 1}})
-    return ProductOut(
-        id=str(d.get("_id")),
-        seller_id=d.get("seller_id"),
-        title=d.get("title"),
-        description=d.get("description"),
-        price=d.get("price"),
-        currency=d.get("currency", "usd"),
-        category=d.get("category"),
-        tags=d.get("tags", []),
-        preview_media_url=d.get("preview_media_url"),
-        status=d.get("status", "active"),
-        stats=d.get("stats", {"views": 0, "sales": 0}),
-    )
+async def get_product(product_id: str):
+    product = await _load_product(product_id)
+    _pending_views[oid(product_id)] += 1
+    return product
 
 
 # ---------------------------- Seller endpoints -----------------------------
 @app.post("/api/seller/products", response_model=Dict[str, str])
-def create_product(product: ProductIn):
+async def create_product(product: ProductIn):
     data = product.model_dump()
     data.update({
         "status": "active",
         "stats": {"views": 0, "sales": 0}
     })
-    new_id = create_document("product", data)
+    new_id = await create_document("product", data)
     # audit
-    create_document("auditlog", {
+    audit({
         "action": "create_product",
         "resource_type": "product",
         "resource_id": new_id,
         "metadata": {"seller_id": product.seller_id}
     })
+    await FastAPICache.clear(namespace="products")
     return {"id": new_id}
 
 
 @app.put("/api/seller/products/{product_id}")
-def update_product(product_id: str, product: ProductIn):
-    result = db.product.update_one({"_id": oid(product_id)}, {"$set": product.model_dump()})
-    if result.matched_count == 0:
+async def update_product(product_id: str, product: ProductIn):
+    data = product.model_dump()
+    # one round-trip that also hands back what the audit entry needs
+    before = await db.product.find_one_and_update(
+        {"_id": oid(product_id)},
+        {"$set": data},
+        projection={"title": 1},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if before is None:
         raise HTTPException(status_code=404, detail="Product not found")
-    create_document("auditlog", {
+    audit({
         "action": "update_product",
         "resource_type": "product",
-        "resource_id": product_id
+        "resource_id": product_id,
+        "metadata": {"title": {"before": before.get("title"), "after": data["title"]}}
     })
+    await FastAPICache.clear(namespace="products")
     return {"updated": True}
 
 
 @app.put("/api/seller/products/{product_id}/status")
-def update_product_status(product_id: str, body: UpdateStatus):
+async def update_product_status(product_id: str, body: UpdateStatus):
     if body.status not in ("active", "suspended"):
         raise HTTPException(status_code=400, detail="Invalid status")
-    result = db.product.update_one({"_id": oid(product_id)}, {"$set": {"status": body.status}})
+    result = await db.product.update_one({"_id": oid(product_id)}, {"$set": {"status": body.status}})
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Product not found")
-    create_document("auditlog", {
+    audit({
         "action": "update_product_status",
         "resource_type": "product",
         "resource_id": product_id,
         "metadata": {"status": body.status}
     })
+    await FastAPICache.clear(namespace="products")
     return {"updated": True}
 
 
 @app.delete("/api/seller/products/{product_id}")
-def delete_product(product_id: str):
-    result = db.product.delete_one({"_id": oid(product_id)})
-    if result.deleted_count == 0:
+async def delete_product(product_id: str):
+    deleted = await db.product.find_one_and_delete({"_id": oid(product_id)}, projection={"title": 1})
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Product not found")
-    create_document("auditlog", {
+    audit({
         "action": "delete_product",
         "resource_type": "product",
-        "resource_id": product_id
+        "resource_id": product_id,
+        "metadata": {"title": deleted.get("title")}
     })
+    await FastAPICache.clear(namespace="products")
     return {"deleted": True}
 
 
 @app.get("/api/seller/products")
-def list_seller_products(seller_id: str):
-    docs = list(db.product.find({"seller_id": seller_id}).sort("created_at", -1))
-    for d in docs:
-        d["id"] = str(d.pop("_id"))
-    return {"products": docs}
+async def list_seller_products(seller_id: str):
+    pipeline = [{"$match": {"seller_id": seller_id}}, {"$sort": {"created_at": -1}}, *ID_AS_STRING]
+    return {"products": await db.product.aggregate(pipeline).to_list(None)}
 
 
 @app.get("/api/seller/analytics")
-def seller_analytics(seller_id: str):
+async def seller_analytics(seller_id: str):
     pipeline = [
         {"$match": {"seller_id": seller_id}},
         {"$group": {
@@ -250,7 +432,7 @@ def seller_analytics(seller_id: str):
             "sales": {"$sum": {"$ifNull": ["$stats.sales", 0]}},
         }}
     ]
-    agg = list(db.product.aggregate(pipeline))
+    agg = await db.product.aggregate(pipeline).to_list(1)
     base = agg[0] if agg else {"revenue": 0, "products": 0, "views": 0, "sales": 0}
     conv = 0.0
     if base.get("views", 0) > 0:
@@ -265,8 +447,8 @@ def seller_analytics(seller_id: str):
 
 
 @app.get("/api/seller/analytics/top-products")
-def seller_top_products(seller_id: str, limit: int = 10):
-    docs = list(db.product.find({"seller_id": seller_id}).sort([("stats.sales", -1), ("stats.views", -1)]).limit(limit))
+async def seller_top_products(seller_id: str, limit: int = Query(10, ge=1, le=100)):
+    docs = await db.product.find({"seller_id": seller_id}).sort([("stats.sales", -1), ("stats.views", -1)]).limit(limit).to_list(limit)
     items = []
     for d in docs:
         items.append({
@@ -283,9 +465,9 @@ def seller_top_products(seller_id: str, limit: int = 10):
 
 
 @app.get("/api/seller/analytics/recent-sales")
-def seller_recent_sales(seller_id: str, limit: int = 20):
+async def seller_recent_sales(seller_id: str, limit: int = Query(20, ge=1, le=100)):
     # find purchases that include this seller's items
-    purchases = list(db.purchase.find({"items.seller_id": seller_id, "payment_status": "paid"}).sort("created_at", -1).limit(limit))
+    purchases = await db.purchase.find({"items.seller_id": seller_id, "payment_status": "paid"}).sort("created_at", -1).limit(limit).to_list(limit)
     rows = []
     for p in purchases:
         for it in p.get("items", []):
@@ -302,64 +484,84 @@ def seller_recent_sales(seller_id: str, limit: int = 20):
 
 
 @app.get("/api/seller/payouts")
-def seller_payouts(seller_id: str):
-    payouts = get_documents("payout", {"seller_id": seller_id})
-    # stringify ids
-    for p in payouts:
-        p["id"] = str(p.pop("_id"))
-    return {"payouts": payouts}
+async def seller_payouts(seller_id: str):
+    pipeline = [{"$match": {"seller_id": seller_id}}, *ID_AS_STRING]
+    return {"payouts": await db.payout.aggregate(pipeline).to_list(None)}
+
+
+@app.get("/api/seller/dashboard")
+async def seller_dashboard(seller_id: str):
+    # analytics and payouts live in different collections; fetch both at once
+    analytics, payouts = await asyncio.gather(
+        seller_analytics(seller_id),
+        seller_payouts(seller_id),
+    )
+    return {"analytics": analytics, "payouts": payouts["payouts"]}
 
 
 @app.post("/api/seller/stripe/onboard")
-def seller_stripe_onboard(seller_id: str):
+async def seller_stripe_onboard(seller_id: str):
     if not stripe.api_key:
         # Demo link fallback
         return {"url": "https://dashboard.stripe.com/register"}
-    account = stripe.Account.create(type="express")
-    link = stripe.AccountLink.create(
+    account = await asyncio.to_thread(
+        stripe.Account.create,
+        type="express",
+        idempotency_key=f"onboard-{seller_id}",
+    )
+    link = await asyncio.to_thread(
+        stripe.AccountLink.create,
         account=account.id,
         refresh_url="https://example.com/reauth",
         return_url="https://example.com/return",
         type="account_onboarding",
     )
-    db.seller.update_one({"user_id": seller_id}, {"$set": {"stripe_connect_id": account.id}}, upsert=True)
+    await db.seller.update_one({"user_id": seller_id}, {"$set": {"stripe_connect_id": account.id}}, upsert=True)
     return {"url": link.url}
 
 
 # ------------------------------ Checkout -----------------------------------
 @app.post("/api/checkout/create-session")
-def create_checkout(req: CheckoutRequest):
+async def create_checkout(req: CheckoutRequest):
     # Load product data and prepare line items
     product_ids = [oid(i.product_id) for i in req.items]
-    docs = list(db.product.find({"_id": {"$in": product_ids}}))
+    docs = await db.product.find(
+        {"_id": {"$in": product_ids}},
+        {"title": 1, "price": 1, "currency": 1, "seller_id": 1},
+    ).to_list(None)
     if not docs:
         raise HTTPException(status_code=400, detail="No valid items")
 
+    # Single pass: line items, purchase snapshot and total together
     total = 0.0
     line_items = []
+    items_snapshot = []
     id_to_qty = {i.product_id: i.quantity for i in req.items}
     for d in docs:
-        qty = id_to_qty.get(str(d["_id"])) or 1
-        price_cents = int(float(d.get("price", 0)) * 100)
-        total += float(d.get("price", 0)) * qty
+        pid = str(d["_id"])
+        qty = id_to_qty.get(pid) or 1
+        price = float(d.get("price", 0))
+        title = d.get("title")
+        total += price * qty
         line_items.append({
             "price_data": {
                 "currency": d.get("currency", "usd"),
-                "product_data": {"name": d.get("title"), "metadata": {"pid": str(d["_id"]) }},
-                "unit_amount": price_cents,
+                "product_data": {"name": title, "metadata": {"pid": pid}},
+                "unit_amount": int(price * 100),
             },
             "quantity": qty,
         })
+        items_snapshot.append({
+            "product_id": pid,
+            "title": title,
+            "price": d.get("price"),
+            "seller_id": d.get("seller_id")
+        })
 
     # Create a purchase record pending
-    purchase_id = create_document("purchase", {
+    purchase_id = await create_document("purchase", {
         "buyer_email": req.buyer_email,
-        "items": [{
-            "product_id": str(d["_id"]),
-            "title": d.get("title"),
-            "price": d.get("price"),
-            "seller_id": d.get("seller_id")
-        } for d in docs],
+        "items": items_snapshot,
         "total_amount": total,
         "currency": docs[0].get("currency", "usd"),
         "provider": req.provider,
@@ -367,7 +569,9 @@ def create_checkout(req: CheckoutRequest):
     })
 
     if req.provider == "stripe" and stripe.api_key:
-        session = stripe.checkout.Session.create(
+        session = await asyncio.to_thread(
+            stripe.checkout.Session.create,
+            idempotency_key=f"checkout-{purchase_id}",
             mode="payment",
             payment_method_types=["card"],
             customer_email=req.buyer_email,
@@ -375,14 +579,16 @@ def create_checkout(req: CheckoutRequest):
             success_url=f"https://example.com/success?purchase_id={purchase_id}",
             cancel_url=f"https://example.com/cancel?purchase_id={purchase_id}",
         )
-        db.purchase.update_one({"_id": oid(purchase_id)}, {"$set": {"transaction_id": session.id}})
+        await db.purchase.update_one({"_id": oid(purchase_id)}, {"$set": {"transaction_id": session.id}})
         return {"provider": "stripe", "session_id": session.id, "url": session.url}
     else:
         # Fallback demo flow when Stripe key not set or using PayPal placeholder
-        db.purchase.update_one({"_id": oid(purchase_id)}, {"$set": {"payment_status": "paid", "transaction_id": "demo_txn"}})
-        # Increment product sales
-        for d in docs:
-            db.product.update_one({"_id": d["_id"]}, {"$inc": {"stats.sales": 1}})
+        await db.purchase.update_one({"_id": oid(purchase_id)}, {"$set": {"payment_status": "paid", "transaction_id": "demo_txn"}})
+        # Increment product sales in a single round-trip
+        await db.product.bulk_write(
+            [UpdateOne({"_id": d["_id"]}, {"$inc": {"stats.sales": 1}}) for d in docs],
+            ordered=False,
+        )
         return {"provider": req.provider, "demo": True, "purchase_id": purchase_id}
 
 
@@ -399,19 +605,41 @@ async def stripe_webhook(request: Request):
 
     if event["type"] == "checkout.session.completed":
         session = event["data"]["object"]
-        purchase = db.purchase.find_one({"transaction_id": session.get("id")})
+        purchase = await db.purchase.find_one({"transaction_id": session.get("id")})
         if purchase:
-            db.purchase.update_one({"_id": purchase["_id"]}, {"$set": {"payment_status": "paid"}})
-            for it in purchase.get("items", []):
-                db.product.update_one({"_id": oid(it.get("product_id"))}, {"$inc": {"stats.sales": 1}})
+            ops = [
+                UpdateOne({"_id": oid(it.get("product_id"))}, {"$inc": {"stats.sales": 1}})
+                for it in purchase.get("items", [])
+            ]
+
+            async def mark_paid(db_session):
+                # Only the first delivery of the event flips the status, so
+                # Stripe retries can't count the same sales twice.
+                result = await db.purchase.update_one(
+                    {"_id": purchase["_id"], "payment_status": {"$ne": "paid"}},
+                    {"$set": {"payment_status": "paid"}},
+                    session=db_session,
+                )
+                if result.modified_count and ops:
+                    await db.product.bulk_write(ops, ordered=False, session=db_session)
+
+            try:
+                async with await db.client.start_session() as db_session:
+                    await db_session.with_transaction(mark_paid)
+            except OperationFailure as e:
+                # standalone mongod has no transactions (IllegalOperation); the
+                # conditional status update still keeps redeliveries safe
+                if e.code != 20:
+                    raise
+                await mark_paid(None)
             # TODO: create transfers to sellers via Stripe Connect
     return {"received": True}
 
 
 # ------------------------------- Buyer -------------------------------------
 @app.get("/api/me/downloads")
-def my_downloads(email: str):
-    purchases = list(db.purchase.find({"buyer_email": email, "payment_status": "paid"}).sort("created_at", -1))
+async def my_downloads(email: str, limit: int = Query(50, ge=1, le=200)):
+    purchases = await db.purchase.find({"buyer_email": email, "payment_status": "paid"}).sort("created_at", -1).limit(limit).to_list(limit)
     results = []
     for p in purchases:
         for it in p.get("items", []):
@@ -424,16 +652,49 @@ def my_downloads(email: str):
 
 
 # ------------------------------- Admin -------------------------------------
+# Platform settings live in a single document with a fixed _id, so reads and
+# writes can upsert it atomically instead of racing to create it.
+SETTINGS_ID = "singleton"
+DEFAULT_SETTINGS = {
+    "commission_percent": 10.0,
+    "payments": {"stripe": True, "paypal": False, "klarna": True, "sofort": True, "giropay": True}
+}
+
+
+async def _settings_seed() -> Dict[str, Any]:
+    """Fields for a newly created singleton: a pre-singleton settings document
+    (ObjectId _id) when one exists, on top of DEFAULT_SETTINGS."""
+    now = datetime.now(timezone.utc)
+    legacy = await db.settings.find_one({"_id": {"$ne": SETTINGS_ID}}, {"_id": 0})
+    return {**DEFAULT_SETTINGS, "created_at": now, "updated_at": now, **(legacy or {})}
+
+
+async def migrate_legacy_settings():
+    """Copy a pre-singleton settings document into SETTINGS_ID.
+
+    Only seeds the singleton when it doesn't exist yet, so it is a no-op once
+    migrated and safe to run from several workers at startup.
+    """
+    if db is None or await db.settings.find_one({"_id": SETTINGS_ID}, {"_id": 1}):
+        return
+    await db.settings.update_one({"_id": SETTINGS_ID}, {"$setOnInsert": await _settings_seed()}, upsert=True)
+
+
+# Short TTL: without REDIS_URL each worker has its own in-memory cache, and
+# update_settings can only clear the cache of the worker that handled it.
 @app.get("/api/admin/settings")
-def get_settings():
-    s = db.settings.find_one({})
-    if not s:
-        # default settings
-        s_id = create_document("settings", {
-            "commission_percent": 10.0,
-            "payments": {"stripe": True, "paypal": False, "klarna": True, "sofort": True, "giropay": True}
-        })
-        s = db.settings.find_one({"_id": oid(s_id)})
+@cache(expire=60, namespace="settings")
+async def get_settings():
+    s = await db.settings.find_one({"_id": SETTINGS_ID})
+    if s is None:
+        # first read (or the startup migration didn't run): create the
+        # singleton atomically, carrying over legacy settings if present
+        s = await db.settings.find_one_and_update(
+            {"_id": SETTINGS_ID},
+            {"$setOnInsert": await _settings_seed()},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
     s["id"] = str(s.pop("_id"))
     return s
 
@@ -444,21 +705,36 @@ class UpdateSettings(BaseModel):
 
 
 @app.put("/api/admin/settings")
-def update_settings(body: UpdateSettings):
+async def update_settings(body: UpdateSettings):
     updates = {k: v for k, v in body.model_dump(exclude_none=True).items()}
-    db.settings.update_one({}, {"$set": updates}, upsert=True)
-    create_document("auditlog", {"action": "update_settings", "resource_type": "settings", "metadata": updates})
+    now = datetime.now(timezone.utc)
+    # if this creates the document, seed whatever isn't being set from the
+    # legacy settings / defaults ($set and $setOnInsert can't share a path)
+    seed = await _settings_seed()
+    on_insert = {k: v for k, v in seed.items() if k not in updates and k != "updated_at"}
+    await db.settings.update_one(
+        {"_id": SETTINGS_ID},
+        {"$set": {**updates, "updated_at": now}, "$setOnInsert": on_insert},
+        upsert=True,
+    )
+    audit({"action": "update_settings", "resource_type": "settings", "metadata": updates})
+    await FastAPICache.clear(namespace="settings")
     return {"updated": True}
 
 
 @app.get("/api/admin/stats")
-def admin_stats():
-    sellers = db.seller.count_documents({})
-    products = db.product.count_documents({})
-    total_revenue = 0.0
-    paid = db.purchase.find({"payment_status": "paid"})
-    for p in paid:
-        total_revenue += float(p.get("total_amount", 0))
+@cache(expire=60, namespace="admin")
+async def admin_stats():
+    revenue_pipeline = [
+        {"$match": {"payment_status": "paid"}},
+        {"$group": {"_id": None, "revenue": {"$sum": {"$ifNull": ["$total_amount", 0]}}}},
+    ]
+    sellers, products, agg = await asyncio.gather(
+        db.seller.count_documents({}),
+        db.product.count_documents({}),
+        db.purchase.aggregate(revenue_pipeline).to_list(1),
+    )
+    total_revenue = float(agg[0]["revenue"]) if agg else 0.0
     return {
         "sellers": sellers,
         "products": products,
@@ -467,32 +743,29 @@ def admin_stats():
 
 
 @app.get("/api/admin/sellers")
-def list_sellers():
-    sellers = list(db.seller.find({}).limit(100))
-    for s in sellers:
-        s["id"] = str(s.pop("_id"))
-    return {"sellers": sellers}
+async def list_sellers(skip: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=200)):
+    cursor = db.seller.aggregate([{"$sort": {"_id": 1}}, {"$skip": skip}, {"$limit": limit}, *ID_AS_STRING])
+    return ndjson_response(cursor)
 
 
 @app.put("/api/admin/sellers/{seller_user_id}/status")
-def set_seller_status(seller_user_id: str, status: str):
+async def set_seller_status(seller_user_id: str, status: str):
     if status not in ("pending", "approved", "suspended"):
         raise HTTPException(status_code=400, detail="Invalid status")
-    db.seller.update_one({"user_id": seller_user_id}, {"$set": {"status": status}}, upsert=True)
+    await db.seller.update_one({"user_id": seller_user_id}, {"$set": {"status": status}}, upsert=True)
     return {"updated": True}
 
 
 @app.get("/api/admin/logs")
-def get_logs(limit: int = 50):
-    logs = list(db.auditlog.find({}).sort("created_at", -1).limit(limit))
-    for l in logs:
-        l["id"] = str(l.pop("_id"))
-    return {"logs": logs}
+async def get_logs(skip: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=200)):
+    cursor = db.auditlog.aggregate([{"$sort": {"created_at": -1}}, {"$skip": skip}, {"$limit": limit}, *ID_AS_STRING])
+    return ndjson_response(cursor)
 
 
 # ------------------------------- Schemas info ------------------------------
 @app.get("/schema")
-def schema_info():
+@cache(expire=300)
+async def schema_info():
     # expose simple schema info for tooling
     return {
         "collections": [